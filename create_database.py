@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, Date, Enum, ForeignKey, Table
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, Date, Enum, ForeignKey, Table, DDL, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -74,9 +74,145 @@ class Formateurs(Base):
     code_rep = Column(Integer, ForeignKey('repertoires.code', ondelete='CASCADE'), primary_key=True)
     siret = Column(String(14), ForeignKey('organismes.siret', ondelete='CASCADE'), primary_key=True)
 
+# Table d'agrégats : stats_type_niveau
+# Nombre de certifications (et part en apprentissage) par type et niveau.
+# Le niveau 0 regroupe les certifications sans niveau renseigné (RS notamment).
+class StatsTypeNiveau(Base):
+    __tablename__ = 'stats_type_niveau'
+    type = Column(Enum('RNCP', 'RS', name='type_enum'), primary_key=True)
+    niveau = Column(Integer, primary_key=True)
+    nb_certifications = Column(Integer, nullable=False, default=0)
+    nb_apprentissage = Column(Integer, nullable=False, default=0)
+
+# Table d'agrégats : stats_nsf
+# Nombre de certifications rattachées à chaque code NSF.
+class StatsNSF(Base):
+    __tablename__ = 'stats_nsf'
+    code_nsf = Column(String(50), primary_key=True)
+    nb_certifications = Column(Integer, nullable=False, default=0)
+
+# Table d'agrégats : stats_organismes
+# Nombre de certificateurs, évaluateurs et formateurs par certification.
+class StatsOrganismes(Base):
+    __tablename__ = 'stats_organismes'
+    code_rep = Column(Integer, primary_key=True)
+    nb_certificateurs = Column(Integer, nullable=False, default=0)
+    nb_evaluateurs = Column(Integer, nullable=False, default=0)
+    nb_formateurs = Column(Integer, nullable=False, default=0)
+
+# Les tables d'agrégats sont tenues à jour par des triggers SQLite : chaque
+# insertion/suppression dans les tables sources applique uniquement son delta,
+# sans recalcul complet. Les insertions ignorées (INSERT OR IGNORE) ne
+# déclenchent pas de trigger et ne faussent donc pas les compteurs.
+
+def _delta_type_niveau(row, signe):
+    """
+    Instructions appliquant le delta d'une ligne de repertoires à stats_type_niveau.
+    Args:
+        row (str): 'NEW' ou 'OLD'.
+        signe (str): '+' ou '-'.
+    """
+    niveau = f"COALESCE({row}.niveau, 0)"
+    return f"""
+        INSERT OR IGNORE INTO stats_type_niveau (type, niveau, nb_certifications, nb_apprentissage)
+        VALUES ({row}.type, {niveau}, 0, 0);
+        UPDATE stats_type_niveau
+        SET nb_certifications = nb_certifications {signe} 1,
+            nb_apprentissage = nb_apprentissage {signe} (CASE WHEN {row}.apprentissage THEN 1 ELSE 0 END)
+        WHERE type = {row}.type AND niveau = {niveau};
+        DELETE FROM stats_type_niveau
+        WHERE type = {row}.type AND niveau = {niveau} AND nb_certifications = 0;"""
+
+def _delta_nsf(row, signe):
+    """
+    Instructions appliquant le delta d'une ligne de repertoires_nsf à stats_nsf.
+    """
+    return f"""
+        INSERT OR IGNORE INTO stats_nsf (code_nsf, nb_certifications) VALUES ({row}.code_nsf, 0);
+        UPDATE stats_nsf SET nb_certifications = nb_certifications {signe} 1
+        WHERE code_nsf = {row}.code_nsf;
+        DELETE FROM stats_nsf WHERE code_nsf = {row}.code_nsf AND nb_certifications = 0;"""
+
+def _delta_organismes(colonne, row, signe):
+    """
+    Instructions appliquant le delta d'une ligne de certificateurs/evaluateurs/formateurs
+    à stats_organismes.
+    """
+    return f"""
+        INSERT OR IGNORE INTO stats_organismes (code_rep, nb_certificateurs, nb_evaluateurs, nb_formateurs)
+        VALUES ({row}.code_rep, 0, 0, 0);
+        UPDATE stats_organismes SET {colonne} = {colonne} {signe} 1
+        WHERE code_rep = {row}.code_rep;
+        DELETE FROM stats_organismes
+        WHERE code_rep = {row}.code_rep
+          AND nb_certificateurs = 0 AND nb_evaluateurs = 0 AND nb_formateurs = 0;"""
+
+def _trigger(nom, evenement, table, corps):
+    return DDL(f"CREATE TRIGGER IF NOT EXISTS {nom} AFTER {evenement} ON {table} FOR EACH ROW BEGIN {corps}\n    END")
+
+STATS_TRIGGERS = {
+    StatsTypeNiveau.__table__: [
+        _trigger('trg_stats_repertoires_insert', 'INSERT', 'repertoires', _delta_type_niveau('NEW', '+')),
+        _trigger('trg_stats_repertoires_delete', 'DELETE', 'repertoires', _delta_type_niveau('OLD', '-')),
+        _trigger('trg_stats_repertoires_update', 'UPDATE OF type, niveau, apprentissage', 'repertoires',
+                 _delta_type_niveau('OLD', '-') + _delta_type_niveau('NEW', '+')),
+    ],
+    StatsNSF.__table__: [
+        _trigger('trg_stats_nsf_insert', 'INSERT', 'repertoires_nsf', _delta_nsf('NEW', '+')),
+        _trigger('trg_stats_nsf_delete', 'DELETE', 'repertoires_nsf', _delta_nsf('OLD', '-')),
+        _trigger('trg_stats_nsf_update', 'UPDATE OF code_nsf', 'repertoires_nsf',
+                 _delta_nsf('OLD', '-') + _delta_nsf('NEW', '+')),
+    ],
+    StatsOrganismes.__table__: [
+        trigger
+        for table, colonne in [('certificateurs', 'nb_certificateurs'),
+                               ('evaluateurs', 'nb_evaluateurs'),
+                               ('formateurs', 'nb_formateurs')]
+        for trigger in [
+            _trigger(f'trg_stats_{table}_insert', 'INSERT', table, _delta_organismes(colonne, 'NEW', '+')),
+            _trigger(f'trg_stats_{table}_delete', 'DELETE', table, _delta_organismes(colonne, 'OLD', '-')),
+            _trigger(f'trg_stats_{table}_update', 'UPDATE OF code_rep', table,
+                     _delta_organismes(colonne, 'OLD', '-') + _delta_organismes(colonne, 'NEW', '+')),
+        ]
+    ],
+}
+
+# Calcul initial des agrégats, exécuté une seule fois à la création des tables
+# (utile lorsqu'elles sont ajoutées à une base déjà peuplée).
+STATS_INITIALISATION = {
+    StatsTypeNiveau.__table__: DDL("""
+        INSERT INTO stats_type_niveau (type, niveau, nb_certifications, nb_apprentissage)
+        SELECT type, COALESCE(niveau, 0), COUNT(*),
+               SUM(CASE WHEN apprentissage THEN 1 ELSE 0 END)
+        FROM repertoires
+        GROUP BY type, COALESCE(niveau, 0)"""),
+    StatsNSF.__table__: DDL("""
+        INSERT INTO stats_nsf (code_nsf, nb_certifications)
+        SELECT code_nsf, COUNT(*) FROM repertoires_nsf GROUP BY code_nsf"""),
+    StatsOrganismes.__table__: DDL("""
+        INSERT INTO stats_organismes (code_rep, nb_certificateurs, nb_evaluateurs, nb_formateurs)
+        SELECT code_rep, SUM(c), SUM(e), SUM(f) FROM (
+            SELECT code_rep, 1 AS c, 0 AS e, 0 AS f FROM certificateurs
+            UNION ALL SELECT code_rep, 0, 1, 0 FROM evaluateurs
+            UNION ALL SELECT code_rep, 0, 0, 1 FROM formateurs
+        ) GROUP BY code_rep"""),
+}
+
+# Les tables d'agrégats doivent être créées après leurs tables sources
+StatsTypeNiveau.__table__.add_is_dependent_on(Repertoires.__table__)
+StatsNSF.__table__.add_is_dependent_on(RepertoiresNSF.__table__)
+for source in (Certificateurs, Evaluateurs, Formateurs):
+    StatsOrganismes.__table__.add_is_dependent_on(source.__table__)
+
+for stats_table, triggers in STATS_TRIGGERS.items():
+    event.listen(stats_table, 'after_create', STATS_INITIALISATION[stats_table])
+    for trigger in triggers:
+        event.listen(stats_table, 'after_create', trigger)
+
 def create_database(db_path: str):
     """
-    Crée la base de données SQLite et les tables.
+    Crée la base de données SQLite et les tables, y compris les tables d'agrégats
+    (stats_*) et les triggers qui les maintiennent à jour.
     Args:
         db_path (str): Chemin vers le fichier SQLite.
     """
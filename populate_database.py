@@ -46,6 +46,8 @@ def populate_database(db_path, csv_dir):
     """
     # Connexion à la base de données
     engine = create_engine(f'sqlite:///{db_path}')
+    # Ajoute les tables d'agrégats et leurs triggers aux bases créées avant leur introduction
+    Base.metadata.create_all(engine)
     Session = sessionmaker(bind=engine)
     session = Session()
 